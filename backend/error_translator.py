@@ -1,32 +1,17 @@
-import os
+import asyncio
 import re
 
-# Optional: LangChain/Groq for richer explanations
-GROQ_AVAILABLE = False
-try:
-    from langchain_groq import ChatGroq
-    from langchain.prompts import PromptTemplate
-    from langchain.chains import LLMChain
-    GROQ_AVAILABLE = bool(os.getenv("GROQ_API_KEY"))
-except Exception:
-    GROQ_AVAILABLE = False
+import llm_cache
+from llm import GROQ_AVAILABLE, get_batcher
 
-if GROQ_AVAILABLE:
-    llm = ChatGroq(
-        model="llama3-8b-8192",
-        temperature=0.1,
-        groq_api_key=os.getenv("GROQ_API_KEY"),
-    )
-    error_prompt = PromptTemplate(
-        input_variables=["error"],
-        template="""
-You are a friendly SQL tutor helping beginners.
+_NO_SUCH_RE = re.compile(r"no such (?:table|column):?\s*[\w.]*(\w+)", re.I)
 
-A student ran a SQL query and got the following database error:
+ERROR_INSTRUCTIONS = """
+You are a friendly SQL tutor helping beginners.
 
-"{error}"
+Each item below is a database error a student got after running a SQL query.
 
-Your job:
+For each error:
 1. Explain what this error means in very simple language.
 2. Explain why this error happened.
 3. Give a clear suggestion on how to fix it.
@@ -35,21 +20,10 @@ Rules:
 - Do NOT use complex database jargon.
 - Do NOT mention internal database details.
 - Keep the explanation short and beginner-friendly.
-- Use bullet points.
-
-Respond in this format:
-
-Meaning:
-- ...
-
-Reason:
-- ...
 
-How to Fix:
-- ...
-""",
-    )
-    error_explainer_chain = LLMChain(llm=llm, prompt=error_prompt)
+Each result must be an object of this form, with short bullet points:
+{"meaning": ["..."], "reason": ["..."], "fix": ["..."]}
+"""
 
 
 def _fallback_translate(error: str):
@@ -59,7 +33,7 @@ def _fallback_translate(error: str):
 
     if "no such table" in err_lower or "no such column" in err_lower:
         sections["meaning"].append("The database doesn't recognize a table or column name you used.")
-        m = re.search(r"no such (?:table|column):?\s*[\w.]*(\w+)", err_lower, re.I)
+        m = _NO_SUCH_RE.search(err_lower)
         name = m.group(1) if m else "it"
         sections["reason"].append(f"Either the table/column '{name}' doesn't exist, or there's a typo.")
         sections["fix"].append("Check your table and column names. Use the dataset selector to see the correct names.")
@@ -83,24 +57,31 @@ def _fallback_translate(error: str):
     return sections
 
 
-def translate_error(error: str):
+def _to_sections(item):
+    """Coerce one entry of the batched JSON reply into meaning/reason/fix lists."""
+    sections = {"meaning": [], "reason": [], "fix": []}
+    if isinstance(item, dict):
+        for key in sections:
+            value = item.get(key) or []
+            if isinstance(value, str):
+                value = [value]
+            sections[key] = [str(v).strip() for v in value if str(v).strip()]
+    return sections
+
+
+async def translate_error(error: str):
     if GROQ_AVAILABLE:
-        try:
-            response = error_explainer_chain.run(error=error)
-            sections = {"meaning": [], "reason": [], "fix": []}
-            current = None
-            for line in response.split("\n"):
-                line = line.strip()
-                if line.lower().startswith("meaning"):
-                    current = "meaning"
-                elif line.lower().startswith("reason"):
-                    current = "reason"
-                elif line.lower().startswith("how to fix"):
-                    current = "fix"
-                elif line.startswith("-") and current:
-                    sections[current].append(line[1:].strip())
-            if any(sections.values()):
-                return sections
-        except Exception:
-            pass
+        key = llm_cache.normalize(error)
+        sections = await llm_cache.load("error", key)
+        if sections is None:
+            try:
+                # The first call imports langchain_groq; keep that off the event loop.
+                batcher = await asyncio.to_thread(get_batcher, "error", ERROR_INSTRUCTIONS, 0.1)
+                sections = _to_sections(await batcher.submit(error))
+            except Exception:
+                sections = None
+            if sections and any(sections.values()):
+                await llm_cache.store("error", key, sections)
+        if sections and any(sections.values()):
+            return {k: list(v) for k, v in sections.items()}
     return _fallback_translate(error)
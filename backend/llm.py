@@ -0,0 +1,40 @@
+import importlib.util
+import os
+import threading
+from functools import lru_cache
+
+from llm_batcher import LLMBatcher
+
+# Optional: LangChain/Groq for richer explanations. Only check that it is installed;
+# the import itself is slow and waits until the first explanation is needed.
+GROQ_AVAILABLE = bool(os.getenv("GROQ_API_KEY")) and importlib.util.find_spec("langchain_groq") is not None
+
+
+@lru_cache(maxsize=1)
+def get_llm():
+    """Single ChatGroq client, so every explainer shares one HTTP connection pool.
+
+    The first call imports langchain_groq (~0.6s), so async callers go through asyncio.to_thread.
+    """
+    from langchain_groq import ChatGroq
+    return ChatGroq(
+        model="llama3-8b-8192",
+        temperature=0.1,
+        groq_api_key=os.getenv("GROQ_API_KEY"),
+    )
+
+
+# Callers build batchers from worker threads; without the lock two concurrent
+# first requests could each create a batcher and leave one worker orphaned.
+_build_lock = threading.Lock()
+
+
+def get_batcher(kind: str, instructions: str, temperature: float):
+    """Batcher for one kind of request, built on first use on top of the shared client."""
+    with _build_lock:
+        return _get_batcher(kind, instructions, temperature)
+
+
+@lru_cache(maxsize=4)
+def _get_batcher(kind: str, instructions: str, temperature: float):
+    return LLMBatcher(get_llm().bind(temperature=temperature), instructions)
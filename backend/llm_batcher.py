@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+# How long to wait for more requests before sending a batch, and the most
+# items a single Groq call may carry.
+BATCH_WINDOW_MS = 30
+MAX_BATCH = 8
+# Groq calls per batcher allowed in flight at once; further batches wait and grow.
+MAX_IN_FLIGHT = 4
+
+
+def _parse_results(response: str):
+    """Pull the JSON object of index -> result out of an LLM reply."""
+    start, end = response.find("{"), response.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("LLM reply did not contain a JSON object")
+    results = json.loads(response[start:end + 1])
+    if not isinstance(results, dict):
+        raise ValueError("LLM reply was not a JSON object")
+    return results
+
+
+def _fail(future, error):
+    if future.done():
+        return
+    try:
+        future.set_exception(error)
+    except RuntimeError:
+        # Its event loop has already closed, so nobody is waiting on it.
+        pass
+
+
+class LLMBatcher:
+    """Coalesce requests arriving within a short window into one Groq call.
+
+    `instructions` describe the task and the JSON shape of each result; the
+    batcher appends the items as a JSON array and asks for a JSON object
+    mapping each item's index to its result. Encoding the items keeps user
+    text from blending into the prompt or shifting one item onto another.
+    """
+
+    def __init__(self, llm, instructions: str):
+        self.llm = llm
+        self.instructions = instructions.strip()
+        self._queue = None
+        self._worker = None
+        self._slots = None
+        self._in_flight = set()
+
+    async def submit(self, item: str):
+        """Queue one item and wait for its entry of the batched reply."""
+        if self._worker is None or self._worker.done():
+            self._restart()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def _restart(self):
+        """Start a fresh worker, failing anything the dead one left queued."""
+        if self._queue is not None:
+            error = RuntimeError("LLM batcher stopped before the item was sent")
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                _fail(future, error)
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+        self._worker = asyncio.create_task(self._drain(self._queue, self._slots))
+
+    async def _drain(self, queue, slots):
+        loop = asyncio.get_running_loop()
+        while True:
+            await slots.acquire()
+            batch = []
+            try:
+                batch.append(await queue.get())
+                deadline = loop.time() + BATCH_WINDOW_MS / 1000
+                while len(batch) < MAX_BATCH:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except BaseException:
+                slots.release()
+                error = RuntimeError("LLM batcher stopped before the item was sent")
+                for _, future in batch:
+                    _fail(future, error)
+                raise
+            # Send without waiting for the reply so several batches can be in flight.
+            # The batch carries its own semaphore so a restart never sees its release.
+            task = asyncio.create_task(self._flush(batch, slots))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    def _build_prompt(self, items):
+        return (
+            f"{self.instructions}\n\n"
+            f"The {len(items)} items are given as a JSON array of strings. "
+            "Process each one independently.\n\n"
+            f"{json.dumps(items)}\n\n"
+            "Return ONLY a JSON object whose keys are the item indexes as strings "
+            f'("0" to "{len(items) - 1}") and whose values are the results. '
+            "No text before or after the object."
+        )
+
+    async def _flush(self, batch, slots):
+        try:
+            await self._send(batch)
+        finally:
+            slots.release()
+
+    async def _send(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            response = await self.llm.ainvoke(self._build_prompt(items))
+            results = _parse_results(getattr(response, "content", response))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if str(i) in results:
+                future.set_result(results[str(i)])
+            else:
+                future.set_exception(ValueError(f"LLM reply had no result for item {i}"))
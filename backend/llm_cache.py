@@ -0,0 +1,97 @@
+import asyncio
+import json
+import re
+from collections import OrderedDict
+
+from sqlalchemy import text
+from database import engine
+
+# Bump when a prompt changes so old explanations are not served again.
+PROMPT_VERSION = "3"
+
+# In-process LRU in front of the SQLite table.
+MEMORY_MAXSIZE = 1024
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_STRING_LITERAL_RE = re.compile(r"('(?:[^']|'')*')")
+_memory = OrderedDict()
+_table_ready = False
+
+
+def normalize(s: str):
+    """Collapse case and whitespace so trivially different inputs share a cache entry.
+
+    Single-quoted literals are kept verbatim: 'IT' and 'it' are different queries.
+    """
+    parts = _STRING_LITERAL_RE.split(s.strip())
+    # split() with a capture group puts the literals at the odd indexes.
+    return "".join(
+        part if i % 2 else _WHITESPACE_RE.sub(" ", part.lower())
+        for i, part in enumerate(parts)
+    )
+
+
+def _versioned(key: str):
+    return f"v{PROMPT_VERSION}:{key}"
+
+
+def _remember(kind: str, key: str, value):
+    _memory[(kind, key)] = value
+    _memory.move_to_end((kind, key))
+    if len(_memory) > MEMORY_MAXSIZE:
+        _memory.popitem(last=False)
+
+
+def _ensure_table(conn):
+    global _table_ready
+    if not _table_ready:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "kind TEXT, key TEXT, value TEXT, PRIMARY KEY (kind, key))"
+        ))
+        _table_ready = True
+
+
+def _read(kind: str, key: str):
+    try:
+        with engine.begin() as conn:
+            _ensure_table(conn)
+            row = conn.execute(
+                text("SELECT value FROM llm_cache WHERE kind = :kind AND key = :key"),
+                {"kind": kind, "key": _versioned(key)},
+            ).first()
+    except Exception:
+        return None
+    return json.loads(row[0]) if row else None
+
+
+async def load(kind: str, key: str):
+    """Return the cached LLM result for (kind, key), or None on a miss.
+
+    Memory hits return immediately; SQLite is read in a worker thread.
+    """
+    if (kind, key) in _memory:
+        _memory.move_to_end((kind, key))
+        return _memory[(kind, key)]
+    value = await asyncio.to_thread(_read, kind, key)
+    if value is not None:
+        _remember(kind, key, value)
+    return value
+
+
+async def store(kind: str, key: str, value):
+    """Cache an LLM result and persist it so it survives restarts. Write failures are ignored."""
+    _remember(kind, key, value)
+    await asyncio.to_thread(_persist, kind, key, value)
+
+
+def _persist(kind: str, key: str, value):
+    try:
+        with engine.begin() as conn:
+            _ensure_table(conn)
+            conn.execute(
+                text("INSERT OR REPLACE INTO llm_cache (kind, key, value) VALUES (:kind, :key, :value)"),
+                {"kind": kind, "key": _versioned(key), "value": json.dumps(value)},
+            )
+    except Exception:
+        pass
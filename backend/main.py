@@ -1,17 +1,45 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Body
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from sql_explainer import explain_sql
 from error_translator import translate_error
-from sqlalchemy import text
-from database import engine
+from sqlalchemy import text, inspect
+from database import engine, readonly_engine
 from sample_data import insert_sample_data
+import orjson
 import pandas as pd
+import sqlglot
+from sqlglot import exp
 import uuid
-import os
 import io
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time
+from functools import lru_cache
 
-app = FastAPI(title="SeeQL — Visual SQL Learning Backend")
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+
+def _json_default(obj):
+    # BLOB columns come back as bytes; show them as text like jsonable_encoder did.
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    return str(obj)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, which is much faster than the stdlib encoder on row lists."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+app = FastAPI(title="SeeQL — Visual SQL Learning Backend", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,8 +49,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Statements allowed in the playground; anything else (DML, DDL, PRAGMA, ATTACH, ...) is rejected.
+_READONLY_STATEMENTS = (exp.Query, exp.Values)
+
+
+@lru_cache(maxsize=4096)
+def _is_write(query: str) -> bool:
+    """True if sqlglot parses the query and some statement does more than read. Cached, since students rerun the same queries.
+
+    Parsing means keywords inside strings, comments or identifiers (e.g. an
+    update_at column) don't matter. Queries sqlglot can't parse are not
+    rejected here: most are beginner typos whose SQLite syntax error should be
+    explained, and readonly_engine's query_only connections refuse any write
+    that slips through.
+    """
+    try:
+        statements = [s for s in sqlglot.parse(query, read="sqlite") if s is not None]
+    except sqlglot.errors.SqlglotError:
+        return False
+    return not all(
+        isinstance(s, _READONLY_STATEMENTS) and s.find(exp.Insert, exp.Update, exp.Delete) is None
+        for s in statements
+    )
+
+
+# Without pyarrow, CSVs are parsed in chunks so large files never sit in one DataFrame.
+CSV_CHUNK_ROWS = 50_000
+
+# CSV export reads this many rows per fetch and flushes to the client every ~64 KB.
+EXPORT_BATCH_ROWS = 5000
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+# /dataset/{name}/data returns this many rows per page unless asked otherwise.
+PREVIEW_DEFAULT_ROWS = 100
+PREVIEW_MAX_ROWS = 1000
+
+# Rows in each offline fallback table created by load_titanic_and_iris.
+FALLBACK_ROW_COUNT = 3
 
 # Dataset metadata for built-in datasets
 DATASET_META = {
@@ -73,19 +136,113 @@ DATASET_META = {
 }
 
 
+def _dedupe_columns(names):
+    """Rename repeated headers to name.1, name.2, ... the way pandas' C parser does.
+
+    pyarrow keeps duplicate names, which to_sql cannot create a table from.
+    """
+    taken = set(names)
+    seen = set()
+    result = []
+    for name in names:
+        if name in seen:
+            n = 1
+            while f"{name}.{n}" in taken:
+                n += 1
+            name = f"{name}.{n}"
+            taken.add(name)
+        seen.add(name)
+        result.append(name)
+    return result
+
+
+def _read_csv_chunks(source):
+    """Yield DataFrames from a CSV path, URL or buffer.
+
+    pyarrow parses the whole file columnar in one pass; the C engine reads in chunks.
+    """
+    if CSV_ENGINE == "pyarrow":
+        df = pd.read_csv(source, engine="pyarrow")
+        df.columns = _dedupe_columns([str(c) for c in df.columns])
+        yield df
+    else:
+        yield from pd.read_csv(source, chunksize=CSV_CHUNK_ROWS)
+
+
+def _to_db_value(value):
+    """Turn a pandas cell into something sqlite3 can bind: dates as ISO text, NaT/NaN as NULL."""
+    if value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, (date, time, pd.Timedelta)):
+        return value.isoformat()
+    return value
+
+
+def _write_frame(conn, table_name: str, df, replace: bool = True):
+    """Bulk insert a DataFrame with one executemany instead of pandas' row-by-row to_sql."""
+    if replace:
+        df.head(0).to_sql(table_name, conn, index=False, if_exists="replace")
+    # Numeric columns bind as-is; datetime-like and object/string columns are converted cell by cell.
+    converted = {
+        col: df[col].map(_to_db_value).astype(object)
+        for col in df.columns
+        if df[col].dtype.kind in "mMO"
+    }
+    if converted:
+        df = df.assign(**converted)
+    placeholders = ", ".join("?" * len(df.columns))
+    # Hand the row iterator straight to sqlite3 so the rows are never copied into a list.
+    cursor = conn.connection.cursor()
+    try:
+        cursor.executemany(f'INSERT INTO "{table_name}" VALUES ({placeholders})', df.itertuples(index=False, name=None))
+    finally:
+        cursor.close()
+
+
+def _fetch_records(conn, query: str, params=None):
+    """Run a query and return (columns, rows as dicts), fetching all rows in one call."""
+    result = conn.execute(text(query), params or {})
+    columns = list(result.keys())
+    return columns, [dict(zip(columns, row)) for row in result.fetchall()]
+
+
+def _titanic_and_iris_loaded():
+    """True when a previous startup already stored the full Titanic and Iris tables."""
+    try:
+        with engine.connect() as conn:
+            names = {row[0] for row in conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name IN ('titanic', 'iris')"
+            ))}
+            if names != {"titanic", "iris"}:
+                return False
+            counts = [conn.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar() for name in ("titanic", "iris")]
+    except Exception:
+        return False
+    # The offline fallback tables are tiny; retry the download if that is all we have.
+    return all(c > FALLBACK_ROW_COUNT for c in counts)
+
+
 def load_titanic_and_iris():
-    """Load Titanic and Iris from public CSV URLs into SQLite."""
+    """Load Titanic and Iris from public CSV URLs into SQLite, unless already stored."""
+    if _titanic_and_iris_loaded():
+        return
     try:
         titanic_url = "https://raw.githubusercontent.com/datasciencedojo/datasets/master/titanic.csv"
         iris_url = "https://raw.githubusercontent.com/uiuc-cse/data-fa14/gh-pages/data/iris.csv"
-        df_t = pd.read_csv(titanic_url)
-        df_i = pd.read_csv(iris_url)
+        # Independent downloads: fetch and parse both at once so startup waits for the slower one only.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            fut_t = pool.submit(pd.read_csv, titanic_url, engine=CSV_ENGINE)
+            fut_i = pool.submit(pd.read_csv, iris_url, engine=CSV_ENGINE)
+            df_t, df_i = fut_t.result(), fut_i.result()
         # Normalize iris column names (some CSVs use spaces)
         df_i.columns = [c.strip().replace(" ", "_").lower() for c in df_i.columns]
         if "species" not in df_i.columns and len(df_i.columns) >= 5:
             df_i.columns = ["sepal_length", "sepal_width", "petal_length", "petal_width", "species"]
-        df_t.to_sql("titanic", engine, index=False, if_exists="replace")
-        df_i.to_sql("iris", engine, index=False, if_exists="replace")
+        with engine.begin() as conn:
+            _write_frame(conn, "titanic", df_t)
+            _write_frame(conn, "iris", df_i)
     except Exception:
         # Fallback: create small iris/titanic tables so app still works
         fallback_iris = pd.DataFrame({
@@ -111,6 +268,7 @@ def load_titanic_and_iris():
 def startup():
     insert_sample_data(engine)
     load_titanic_and_iris()
+    _build_datasets_cache()
 
 
 @app.get("/create-session")
@@ -127,38 +285,59 @@ def get_sample_datasets():
     return {"datasets": ["students", "employees", "titanic", "iris"]}
 
 
+# Built-in tables only change during startup, so /datasets is computed once there.
+_datasets_cache = None
+
+
+def _dataset_stats(keys):
+    """Row counts from one UNION ALL query and column names from the inspector."""
+    tables = {key: DATASET_META.get(key, {}).get("table_name", key) for key in keys}
+    insp = inspect(engine)
+    existing = set(insp.get_table_names())
+    present = [key for key in keys if tables[key] in existing]
+    counts = {}
+    if present:
+        query = " UNION ALL ".join(f"SELECT '{key}' AS id, COUNT(*) AS c FROM {tables[key]}" for key in present)
+        with engine.connect() as conn:
+            counts = {row.id: row.c for row in conn.execute(text(query))}
+    columns = {key: [c["name"] for c in insp.get_columns(tables[key])] for key in present}
+    return counts, columns
+
+
+def _build_datasets_cache():
+    """Compute the /datasets response (descriptions, columns, row counts) and keep it."""
+    global _datasets_cache
+    keys = ["students", "employees", "titanic", "iris"]
+    try:
+        counts, columns = _dataset_stats(keys)
+    except Exception:
+        counts, columns = {}, {}
+    result = []
+    for key in keys:
+        meta = DATASET_META.get(key, {})
+        result.append({
+            "id": key,
+            "name": meta.get("name", key),
+            "description": meta.get("description", ""),
+            "table_name": meta.get("table_name", key),
+            "row_count": counts.get(key, 0),
+            "columns": columns.get(key, []),
+            "example_queries": meta.get("example_queries", []),
+            "learning_goals": meta.get("learning_goals", []),
+        })
+    _datasets_cache = {"datasets": result}
+    return _datasets_cache
+
+
 @app.get("/datasets")
 def get_datasets_with_metadata():
     """Return all built-in datasets with description, columns, row count."""
-    result = []
-    with engine.connect() as conn:
-        for key in ["students", "employees", "titanic", "iris"]:
-            meta = DATASET_META.get(key, {})
-            table_name = meta.get("table_name", key)
-            try:
-                r = conn.execute(text(f"SELECT COUNT(*) as c FROM {table_name}"))
-                row_count = r.scalar() or 0
-                r2 = conn.execute(text(f"SELECT * FROM {table_name} LIMIT 1"))
-                columns = list(r2.keys()) if r2 else []
-            except Exception:
-                row_count = 0
-                columns = []
-            result.append({
-                "id": key,
-                "name": meta.get("name", key),
-                "description": meta.get("description", ""),
-                "table_name": table_name,
-                "row_count": row_count,
-                "columns": columns,
-                "example_queries": meta.get("example_queries", []),
-                "learning_goals": meta.get("learning_goals", []),
-            })
-    return {"datasets": result}
+    return _datasets_cache or _build_datasets_cache()
 
 
 @app.get("/dataset/{table_name}/data")
-def get_dataset_data(table_name: str):
-    """Return full table data for a built-in or uploaded table."""
+def get_dataset_data(table_name: str, limit: int = PREVIEW_DEFAULT_ROWS, offset: int = 0):
+    """Return one page of rows for a built-in or uploaded table, plus the total row count."""
     # Allow only alphanumeric and underscore
     if not table_name.replace("_", "").isalnum():
         raise HTTPException(status_code=400, detail="Invalid table name")
@@ -166,11 +345,23 @@ def get_dataset_data(table_name: str):
         pass
     else:
         raise HTTPException(status_code=404, detail="Unknown dataset")
+    limit = min(max(limit, 1), PREVIEW_MAX_ROWS)
+    offset = max(offset, 0)
     try:
         with engine.connect() as conn:
-            result = conn.execute(text(f"SELECT * FROM {table_name}"))
-            rows = [dict(row._mapping) for row in result]
-        return {"rows": rows, "row_count": len(rows), "columns": list(rows[0].keys()) if rows else []}
+            total = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+            columns, rows = _fetch_records(
+                conn, f"SELECT * FROM {table_name} LIMIT :limit OFFSET :offset", {"limit": limit, "offset": offset}
+            )
+        # Returned directly so FastAPI skips jsonable_encoder on every row.
+        return ORJSONResponse({
+            "rows": rows,
+            "row_count": len(rows),
+            "columns": columns,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -187,56 +378,64 @@ def get_dataset_meta(dataset_id: str):
 # -------------------------------
 # Upload CSV dataset
 # -------------------------------
+def _load_csv(content: bytes, table_name: str):
+    """Parse CSV bytes and write them to a table in one transaction."""
+    columns, row_count = [], 0
+    with engine.begin() as conn:
+        for i, chunk in enumerate(_read_csv_chunks(io.BytesIO(content))):
+            _write_frame(conn, table_name, chunk, replace=i == 0)
+            columns = list(chunk.columns)
+            row_count += len(chunk)
+    return columns, row_count
+
+
 @app.post("/upload-dataset")
 async def upload_dataset(file: UploadFile = File(...)):
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are supported.")
 
     file_id = str(uuid.uuid4())
-    file_path = os.path.join(UPLOAD_DIR, f"{file_id}.csv")
     content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
 
+    table_name = f"user_{file_id[:8]}"
     try:
-        df = pd.read_csv(io.BytesIO(content))
+        columns, row_count = await run_in_threadpool(_load_csv, content, table_name)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not read CSV: {str(e)}")
 
-    table_name = f"user_{file_id[:8]}"
-    df.to_sql(table_name, engine, index=False, if_exists="replace")
-
     return {
         "message": "Dataset uploaded successfully",
         "table_name": table_name,
         "dataset_id": table_name,
         "name": file.filename.replace(".csv", ""),
-        "columns": list(df.columns),
-        "row_count": len(df),
+        "columns": columns,
+        "row_count": row_count,
     }
 
 
 # -------------------------------
 # Run SQL Query
 # -------------------------------
+def _execute_query(query: str):
+    with readonly_engine.connect() as conn:
+        return _fetch_records(conn, query)
+
+
 @app.post("/run-query")
-def run_query(body: dict = Body(...)):
+async def run_query(body: dict = Body(...)):
     query = (body or {}).get("query", "")
     if not query or not query.strip():
         raise HTTPException(status_code=400, detail="Query is required")
 
-    forbidden = ["DROP", "DELETE", "UPDATE", "ALTER", "INSERT", "TRUNCATE"]
-    q_upper = query.upper()
-    if any(word in q_upper for word in forbidden):
+    if _is_write(query):
         raise HTTPException(status_code=403, detail="This type of query is not allowed in the playground.")
 
     try:
-        with engine.connect() as conn:
-            result = conn.execute(text(query))
-            rows = [dict(row._mapping) for row in result]
-        return {"rows": rows, "row_count": len(rows)}
+        columns, rows = await run_in_threadpool(_execute_query, query)
+        # Returned directly so FastAPI skips jsonable_encoder on every row.
+        return ORJSONResponse({"rows": rows, "row_count": len(rows), "columns": columns})
     except Exception as e:
-        explanation = translate_error(str(e))
+        explanation = await translate_error(str(e))
         return {
             "error": True,
             "error_explanation": explanation,
@@ -248,17 +447,34 @@ def run_query(body: dict = Body(...)):
 # Explain query (step-by-step)
 # -------------------------------
 @app.post("/explain-query")
-def explain_query(body: dict = Body(...)):
+async def explain_query(body: dict = Body(...)):
     query = (body or {}).get("query", "")
     if not query or not query.strip():
         return {"steps": ["Enter a SQL query to see an explanation."]}
-    steps = explain_sql(query)
+    steps = await explain_sql(query)
     return {"steps": steps}
 
 
 # -------------------------------
 # Export result as CSV or JSON
 # -------------------------------
+def _stream_csv(conn, result):
+    """Yield a query result as CSV in chunks, closing the connection when done."""
+    try:
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        writer.writerow(result.keys())
+        for rows in result.partitions(EXPORT_BATCH_ROWS):
+            writer.writerows(rows)
+            if buf.tell() >= EXPORT_FLUSH_BYTES:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        yield buf.getvalue()
+    finally:
+        conn.close()
+
+
 @app.post("/export")
 def export_result(body: dict = Body(...)):
     """Export the last query result. Expects { \"query\": \"...\", \"format\": \"csv\" | \"json\" }."""
@@ -269,23 +485,27 @@ def export_result(body: dict = Body(...)):
     if not query or not query.strip():
         raise HTTPException(status_code=400, detail="Query is required")
 
-    forbidden = ["DROP", "DELETE", "UPDATE", "ALTER", "INSERT", "TRUNCATE"]
-    if any(w in query.upper() for w in forbidden):
+    if _is_write(query):
         raise HTTPException(status_code=403, detail="This query is not allowed.")
 
+    if fmt == "json":
+        try:
+            with readonly_engine.connect() as conn:
+                _, rows = _fetch_records(conn, query)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return ORJSONResponse(content=rows)
+
+    # Run the query up front so SQL errors still come back as a 400.
+    conn = readonly_engine.connect()
     try:
-        df = pd.read_sql_query(query, engine)
+        result = conn.execution_options(stream_results=True).execute(text(query))
     except Exception as e:
+        conn.close()
         raise HTTPException(status_code=400, detail=str(e))
 
-    if fmt == "json":
-        return JSONResponse(content=df.to_dict(orient="records"))
-
-    buf = io.StringIO()
-    df.to_csv(buf, index=False)
-    buf.seek(0)
-    return Response(
-        content=buf.getvalue(),
+    return StreamingResponse(
+        _stream_csv(conn, result),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=seeql-export.csv"},
     )
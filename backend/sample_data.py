@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, Float, MetaData
+from sqlalchemy import Table, Column, Integer, String, Float, MetaData, select, func
 
 metadata = MetaData()
 
@@ -21,18 +21,21 @@ employees = Table(
 
 
 def insert_sample_data(engine):
+    """Create the sample tables and fill them once; later startups leave existing rows alone."""
     metadata.create_all(engine)
-    with engine.connect() as conn:
-        conn.execute(students.insert(), [
-            {"name": "Amit", "marks": 85},
-            {"name": "Neha", "marks": 92},
-            {"name": "Rahul", "marks": 70},
-            {"name": "Priya", "marks": 88},
-            {"name": "Vikram", "marks": 65},
-        ])
-        conn.execute(employees.insert(), [
-            {"name": "Ravi", "department": "IT", "salary": 60000},
-            {"name": "Anita", "department": "HR", "salary": 50000},
-            {"name": "Suresh", "department": "IT", "salary": 72000},
-            {"name": "Kavita", "department": "Finance", "salary": 55000},
-        ])
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(students)).scalar() == 0:
+            conn.execute(students.insert(), [
+                {"name": "Amit", "marks": 85},
+                {"name": "Neha", "marks": 92},
+                {"name": "Rahul", "marks": 70},
+                {"name": "Priya", "marks": 88},
+                {"name": "Vikram", "marks": 65},
+            ])
+        if conn.execute(select(func.count()).select_from(employees)).scalar() == 0:
+            conn.execute(employees.insert(), [
+                {"name": "Ravi", "department": "IT", "salary": 60000},
+                {"name": "Anita", "department": "HR", "salary": 50000},
+                {"name": "Suresh", "department": "IT", "salary": 72000},
+                {"name": "Kavita", "department": "Finance", "salary": 55000},
+            ])
@@ -1,57 +1,40 @@
-import os
+import asyncio
 import re
 
-# Optional: LangChain/Groq for step-by-step explanations
-GROQ_AVAILABLE = False
-try:
-    from langchain_groq import ChatGroq
-    from langchain.prompts import PromptTemplate
-    from langchain.chains import LLMChain
-    GROQ_AVAILABLE = bool(os.getenv("GROQ_API_KEY"))
-except Exception:
-    GROQ_AVAILABLE = False
+import llm_cache
+from llm import GROQ_AVAILABLE, get_batcher
 
-if GROQ_AVAILABLE:
-    llm = ChatGroq(
-        model="llama3-8b-8192",
-        temperature=0.2,
-        groq_api_key=os.getenv("GROQ_API_KEY"),
-    )
-    sql_prompt = PromptTemplate(
-        input_variables=["query"],
-        template="""
+_TOKEN_RE = re.compile(r"[A-Za-z_]+")
+_COMPOUND_RE = re.compile(r"\b(ORDER|GROUP)\s+BY\b", re.I)
+
+EXPLAIN_INSTRUCTIONS = """
 You are a friendly SQL tutor for beginners.
 
-Explain the following SQL query step-by-step in very simple language.
+Each item below is a SQL query. Explain each one step-by-step in very simple language.
 Do NOT use complex database terms.
 Explain in the logical order SQL executes.
 
-SQL Query:
-{query}
-
-Return the explanation as numbered steps.
-""",
-    )
-    sql_explainer_chain = LLMChain(llm=llm, prompt=sql_prompt)
+Each result must be a list of strings, one string per numbered step.
+"""
 
 
 def _fallback_explain(query: str):
     """Simple rule-based explanation when Groq is not available."""
-    q = query.strip()
-    q_upper = q.upper()
+    tokens = {t.upper() for t in _TOKEN_RE.findall(query)}
+    tokens.update(f"{m.upper()} BY" for m in _COMPOUND_RE.findall(query))
     steps = []
 
-    if "SELECT" in q_upper:
+    if "SELECT" in tokens:
         steps.append("SELECT tells the database which columns to show. You listed the columns (or * for all) you want to see.")
-    if "FROM" in q_upper:
+    if "FROM" in tokens:
         steps.append("FROM tells the database which table to read from. Your data comes from this table.")
-    if "WHERE" in q_upper:
+    if "WHERE" in tokens:
         steps.append("WHERE filters the rows. Only rows that match your condition are kept.")
-    if "ORDER BY" in q_upper:
+    if "ORDER BY" in tokens:
         steps.append("ORDER BY sorts the result. Rows are arranged in the order you specified (e.g. by a column, ascending or descending).")
-    if "GROUP BY" in q_upper:
+    if "GROUP BY" in tokens:
         steps.append("GROUP BY groups rows that share the same value in a column. Often used with COUNT or AVG to summarize data.")
-    if "LIMIT" in q_upper:
+    if "LIMIT" in tokens:
         steps.append("LIMIT caps how many rows are returned. The rest are not shown.")
 
     if not steps:
@@ -59,13 +42,28 @@ def _fallback_explain(query: str):
     return steps
 
 
-def explain_sql(query: str):
+def _to_steps(item):
+    """Coerce one entry of the batched JSON reply into a list of steps."""
+    if isinstance(item, str):
+        item = item.split("\n")
+    if not isinstance(item, list):
+        return []
+    return [str(s).strip() for s in item if str(s).strip()]
+
+
+async def explain_sql(query: str):
     if GROQ_AVAILABLE:
-        try:
-            response = sql_explainer_chain.run(query=query)
-            steps = [s.strip() for s in response.split("\n") if s.strip()]
+        key = llm_cache.normalize(query)
+        steps = await llm_cache.load("explain", key)
+        if steps is None:
+            try:
+                # The first call imports langchain_groq; keep that off the event loop.
+                batcher = await asyncio.to_thread(get_batcher, "explain", EXPLAIN_INSTRUCTIONS, 0.2)
+                steps = _to_steps(await batcher.submit(query))
+            except Exception:
+                steps = None
             if steps:
-                return steps
-        except Exception:
-            pass
+                await llm_cache.store("explain", key, steps)
+        if steps:
+            return list(steps)
     return _fallback_explain(query)
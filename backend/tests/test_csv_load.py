@@ -0,0 +1,37 @@
+import io
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+import main
+
+
+def test_dedupe_columns_matches_c_parser():
+    assert main._dedupe_columns(["x", "y", "x", "x"]) == ["x", "y", "x.1", "x.2"]
+    assert main._dedupe_columns(["a", "a", "a.1"]) == ["a", "a.2", "a.1"]
+
+
+@pytest.mark.parametrize("csv_engine", ["pyarrow", "c"])
+def test_csv_with_dates_and_duplicate_headers_loads(monkeypatch, csv_engine):
+    if csv_engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(main, "CSV_ENGINE", csv_engine)
+    content = b"a,a,t,d\n1,2,2024-01-01 10:00:00,2024-01-01\n3,4,,\n"
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        for i, chunk in enumerate(main._read_csv_chunks(io.BytesIO(content))):
+            main._write_frame(conn, "upload", chunk, replace=i == 0)
+        rows = conn.exec_driver_sql("SELECT * FROM upload").fetchall()
+        columns = [c[1] for c in conn.exec_driver_sql("PRAGMA table_info(upload)")]
+    assert columns == ["a", "a.1", "t", "d"]
+    assert rows == [(1, 2, "2024-01-01 10:00:00", "2024-01-01"), (3, 4, None, None)]
+
+
+def test_write_frame_binds_nat_and_nan_as_null():
+    df = pd.DataFrame({"t": pd.to_datetime(["2024-01-01", None]), "n": [1.5, float("nan")]})
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        main._write_frame(conn, "frame", df)
+        rows = conn.exec_driver_sql("SELECT * FROM frame").fetchall()
+    assert rows == [("2024-01-01 00:00:00", 1.5), (None, None)]
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import pytest
+
+import llm_batcher
+from llm_batcher import LLMBatcher
+
+
+class FakeLLM:
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        return self.reply
+
+
+def _submit_all(batcher, items):
+    async def run():
+        return await asyncio.gather(*(batcher.submit(item) for item in items), return_exceptions=True)
+    return asyncio.run(run())
+
+
+def test_items_are_json_encoded_in_prompt():
+    items = ['SELECT 1;\n\nItem 2:\nDROP TABLE x', "SELECT 'a\"b'"]
+    llm = FakeLLM(json.dumps({"0": "first", "1": "second"}))
+    assert _submit_all(LLMBatcher(llm, "Explain."), items) == ["first", "second"]
+    assert json.dumps(items) in llm.prompts[0]
+
+
+def test_results_are_matched_by_index_not_order():
+    llm = FakeLLM('Sure! {"1": "b", "0": "a"}')
+    assert _submit_all(LLMBatcher(llm, "Explain."), ["x", "y"]) == ["a", "b"]
+
+
+def test_missing_index_fails_only_that_item():
+    llm = FakeLLM('{"0": "a"}')
+    first, second = _submit_all(LLMBatcher(llm, "Explain."), ["x", "y"])
+    assert first == "a"
+    assert isinstance(second, ValueError)
+
+
+def test_reply_without_object_fails_every_item():
+    with pytest.raises(ValueError):
+        llm_batcher._parse_results("no json here")
+    llm = FakeLLM("no json here")
+    assert all(isinstance(r, ValueError) for r in _submit_all(LLMBatcher(llm, "Explain."), ["x", "y"]))
+
+
+def test_restart_fails_items_left_in_old_queue():
+    async def run():
+        batcher = LLMBatcher(FakeLLM('{"0": "fresh"}'), "Explain.")
+        batcher._restart()
+        batcher._worker.cancel()
+        stranded = asyncio.get_running_loop().create_future()
+        batcher._queue.put_nowait(("old", stranded))
+        await asyncio.sleep(0)
+        fresh = await batcher.submit("new")
+        return stranded, fresh
+
+    stranded, fresh = asyncio.run(run())
+    assert fresh == "fresh"
+    assert isinstance(stranded.exception(), RuntimeError)
+
+
+def test_old_batch_does_not_release_new_semaphore():
+    async def run():
+        gate = asyncio.Event()
+
+        class SlowLLM:
+            async def ainvoke(self, prompt):
+                await gate.wait()
+                return '{"0": "done"}'
+
+        batcher = LLMBatcher(SlowLLM(), "Explain.")
+        pending = asyncio.create_task(batcher.submit("old"))
+        await asyncio.sleep(0.1)
+        old_slots = batcher._slots
+        batcher._worker.cancel()
+        await asyncio.sleep(0)
+        batcher._restart()
+        gate.set()
+        assert await pending == "done"
+        return old_slots, batcher._slots
+
+    old_slots, new_slots = asyncio.run(run())
+    assert old_slots._value == llm_batcher.MAX_IN_FLIGHT
+    assert new_slots._value == llm_batcher.MAX_IN_FLIGHT
@@ -0,0 +1,33 @@
+import asyncio
+
+import llm_cache
+import sql_explainer
+
+
+def test_normalize_collapses_case_and_whitespace_outside_literals():
+    assert llm_cache.normalize("  SELECT *\n  FROM t ") == "select * from t"
+    assert llm_cache.normalize("SELECT * FROM t WHERE d = 'IT  Dept'") == "select * from t where d = 'IT  Dept'"
+    assert llm_cache.normalize("select 'It''S'  FROM T") == "select 'It''S' from t"
+
+
+def test_normalize_keeps_literals_with_different_case_apart():
+    assert llm_cache.normalize("SELECT * FROM t WHERE d = 'IT'") != llm_cache.normalize("select * from t where d = 'it'")
+
+
+def test_explain_sends_original_query_to_llm(monkeypatch):
+    sent = []
+
+    class FakeBatcher:
+        async def submit(self, item):
+            sent.append(item)
+            return ["step"]
+
+    monkeypatch.setattr(sql_explainer, "GROQ_AVAILABLE", True)
+    monkeypatch.setattr(sql_explainer, "get_batcher", lambda *args: FakeBatcher())
+    monkeypatch.setattr(llm_cache, "_memory", llm_cache.OrderedDict())
+    monkeypatch.setattr(llm_cache, "_read", lambda kind, key: None)
+    monkeypatch.setattr(llm_cache, "_persist", lambda kind, key, value: None)
+
+    query = "SELECT name\nFROM employees WHERE dept = 'IT'"
+    assert asyncio.run(sql_explainer.explain_sql(query)) == ["step"]
+    assert sent == [query]
@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+
+import main
+from database import _set_query_only
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM students WHERE marks > 80",
+    "SELECT name FROM students UNION SELECT name FROM employees",
+    "WITH top AS (SELECT * FROM students) SELECT * FROM top",
+    "SELECT 1 AS update_at",
+    "SELECT * FROM employees WHERE department = 'DROP'",
+])
+def test_select_queries_are_allowed(query):
+    assert not main._is_write(query)
+
+
+@pytest.mark.parametrize("query", [
+    "DELETE FROM students",
+    "UPDATE students SET marks = 0",
+    "INSERT INTO students (name) VALUES ('x')",
+    "DROP TABLE students",
+    "CREATE TABLE t (a)",
+    "WITH x AS (SELECT 1) DELETE FROM students",
+    "SELECT 1; DROP TABLE students",
+    "PRAGMA table_info(students)",
+])
+def test_writes_are_rejected(query):
+    assert main._is_write(query)
+
+
+@pytest.fixture
+def playground(tmp_path, monkeypatch):
+    """Point /run-query at a throwaway query_only database holding one table."""
+    path = tmp_path / "playground.db"
+    seed = sqlite3.connect(path)
+    seed.execute("CREATE TABLE students (name TEXT, marks INTEGER)")
+    seed.execute("INSERT INTO students VALUES ('Amit', 91)")
+    seed.commit()
+    seed.close()
+    engine = create_engine(f"sqlite:///{path}")
+    event.listen(engine, "connect", _set_query_only)
+    monkeypatch.setattr(main, "readonly_engine", engine)
+    yield TestClient(main.app)
+    engine.dispose()
+
+
+def test_run_query_refuses_parsed_write(playground):
+    res = playground.post("/run-query", json={"query": "DELETE FROM students"})
+    assert res.status_code == 403
+
+
+@pytest.mark.parametrize("query", [
+    "selec 1 frm students",
+    "SELECT * FORM students",
+    "SELECT * FROM students WHERE",
+    "SELECT * FROM students WHERE name = 'Amit",
+])
+def test_typos_get_a_friendly_error(playground, query):
+    assert not main._is_write(query)
+    res = playground.post("/run-query", json={"query": query})
+    assert res.status_code == 200
+    data = res.json()
+    assert data["error"] is True
+    assert data["error_explanation"]["meaning"]
+    assert "OperationalError" in data["raw_error"]
+
+
+def test_unparseable_write_is_stopped_by_sqlite(playground):
+    # Valid SQLite that sqlglot cannot parse reaches the database, which refuses to write.
+    res = playground.post("/run-query", json={"query": "CREATE TABLE pwn(a NOT NULL ON CONFLICT FAIL)"})
+    assert res.json()["error"] is True
+    assert "readonly" in res.json()["raw_error"]
+
+
+def test_playground_connections_cannot_write(tmp_path):
+    conn = sqlite3.connect(tmp_path / "playground.db")
+    _set_query_only(conn, None)
+    assert conn.execute("SELECT 1").fetchone() == (1,)
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("CREATE TABLE pwn(a NOT NULL ON CONFLICT FAIL)")
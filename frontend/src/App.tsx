@@ -25,6 +25,7 @@ function App() {
   const [datasets, setDatasets] = useState<DatasetMeta[]>([])
   const [selectedDataset, setSelectedDataset] = useState<DatasetMeta | null>(null)
   const [tableData, setTableData] = useState<Record<string, unknown>[]>([])
+  const [tableTotal, setTableTotal] = useState(0)
   const [query, setQuery] = useState('')
   const [result, setResult] = useState<Record<string, unknown>[] | null>(null)
   const [loading, setLoading] = useState(false)
@@ -61,10 +62,12 @@ function App() {
       if (!res.ok) throw new Error('Failed to load data')
       const data = await res.json()
       setTableData(data.rows ?? [])
+      setTableTotal(data.total ?? data.rows?.length ?? 0)
       setResult(null)
       setError(null)
     } catch {
       setTableData([])
+      setTableTotal(0)
     }
   }, [])
 
@@ -230,7 +233,11 @@ function App() {
             <span className="section-label">Explore Data</span>
             <p className="table-meta">
               {selectedDataset.description}
-              <span> · {exploreRows.length} row{exploreRows.length !== 1 ? 's' : ''}</span>
+              <span>
+                {' · '}
+                {tableTotal > exploreRows.length ? `showing ${exploreRows.length} of ` : ''}
+                {tableTotal} row{tableTotal !== 1 ? 's' : ''}
+              </span>
             </p>
             <div className="table-wrap card">
               <AnimatePresence mode="wait">